@@ -17,105 +17,369 @@ Daemon mode (fast):
     mcp-cli --daemon-stop                    # Stop daemon
 
 Config: ~/.mcp-cli/servers.json
+
+HTTP/2: pip install 'httpx[http2]' and servers that offer h2 via ALPN
+multiplex requests over one connection automatically.
 """
 
-import argparse
 import json
 import os
 import sys
-import uuid
-import webbrowser
+import itertools
 import threading
 import time
-import hashlib
-import base64
-import secrets
 import socket
+import selectors
 import signal
 import atexit
 from pathlib import Path
-from http.server import HTTPServer, BaseHTTPRequestHandler
-from urllib.parse import urlparse, parse_qs, urlencode
 
+# httpx and the OAuth-only modules (webbrowser, hashlib, base64, secrets,
+# http.server, urllib.parse, concurrent.futures) are imported where they
+# are used so daemon queries and status checks don't pay for them at
+# startup.
+
+# orjson is optional; it parses and serializes straight from/to bytes
 try:
-    import httpx
+    import orjson
 except ImportError:
-    print('{"ok": false, "error": {"code": "MISSING_DEP", "message": "httpx required: pip install httpx"}}')
-    sys.exit(1)
+    orjson = None
+
+
+def stdlib_json_dumps(obj, indent=False):
+    """Serialize obj to JSON bytes with the stdlib encoder."""
+    if indent:
+        return json.dumps(obj, indent=2).encode()
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+if orjson:
+    # orjson turns integers outside [-2**63, 2**64 - 1] into floats on load
+    # (and refuses to dump them). Such a float is always at least 2**63 in
+    # magnitude, so a parse holding one is redone with the exact stdlib
+    # parser. Checking the parsed values rather than scanning the raw bytes
+    # costs nothing for results whose bulk is text, and digit runs inside
+    # strings (nanosecond timestamps in logs) never trigger a re-parse.
+    _INT64_LIMIT = float(2**63)
+
+    def parsed_exactly(values):
+        """Check that no parsed value, however nested, may be a rounded integer."""
+        stack = [values]
+        while stack:
+            container = stack.pop()
+            for value in container.values() if type(container) is dict else container:
+                kind = type(value)
+                if kind is dict or kind is list:
+                    stack.append(value)
+                elif kind is float and not -_INT64_LIMIT < value < _INT64_LIMIT:
+                    return False
+        return True
+
+    def json_loads(data):
+        """Parse JSON bytes, keeping integers of any size exact."""
+        obj = orjson.loads(data)
+        return obj if parsed_exactly((obj,)) else json.loads(data)
+
+    def json_dumps(obj, indent=False):
+        """Serialize obj to JSON bytes."""
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+        except TypeError:
+            return stdlib_json_dumps(obj, indent)
+else:
+    json_loads = json.loads
+    json_dumps = stdlib_json_dumps
 
 CONFIG_DIR = Path.home() / ".mcp-cli"
 CONFIG_FILE = CONFIG_DIR / "servers.json"
 SESSION_FILE = CONFIG_DIR / "sessions.json"
 TOKENS_FILE = CONFIG_DIR / "tokens.json"
+TOOLS_CACHE_FILE = CONFIG_DIR / "tools_cache.json"
 SOCKET_PATH = CONFIG_DIR / "daemon.sock"
 PID_FILE = CONFIG_DIR / "daemon.pid"
+DAEMON_SOCKET_BUFSIZE = 256 * 1024
+DAEMON_IO_TIMEOUT = 30.0  # Per-connection read/write timeout
+DAEMON_PING_TIMEOUT = 2.0  # Liveness checks give up quickly on a stuck daemon
+MAX_MESSAGE_SIZE = 64 * 1024 * 1024  # Largest framed daemon message accepted
+DAEMON_WORKERS = 16  # Connections served concurrently
+SSE_CHUNK_SIZE = 64 * 1024
 TOOLS_CACHE_TTL = 300  # 5 minutes
+TOOLS_ERROR_TTL = 5  # Back off briefly after a failed tools/list
+TOKEN_REFRESH_BUFFER = 300  # Refresh OAuth tokens 5 minutes before expiry
+TOKEN_REFRESH_BACKOFF = 30  # Serve the old token this long after a failed refresh
+SESSION_TTL = 3600  # Re-initialize cached sessions after 1 hour
+SESSION_NOT_FOUND = -32001  # Server rejected our Mcp-Session-Id (HTTP 404)
 
 DEFAULT_HEADERS = {
     "Content-Type": "application/json",
     "Accept": "application/json, text/event-stream",
 }
 
+# Preserialized JSON-RPC envelopes for the daemon's hot requests
+TOOLS_LIST_TEMPLATE = b'{"jsonrpc":"2.0","method":"tools/list","id":%d}'
+TOOLS_CALL_TEMPLATE = (
+    b'{"jsonrpc":"2.0","method":"tools/call","id":%d,'
+    b'"params":{"name":%s,"arguments":%s}}'
+)
+
+_HTTP_CLIENT = None
+_HTTP_CLIENT_LOCK = threading.Lock()  # Daemon workers may race to create it
+_CONFIG_CACHE = None  # ((st_mtime_ns, st_size), config)
+_TOKEN_MEMO = {}  # server_name -> (access_token, monotonic time to refresh at)
+_TOKEN_LOCKS = {}  # server_name -> lock serializing that server's refreshes
+_TOKENS_LOCK = threading.Lock()  # Guards the tokens.json read-modify-write
+_SESSIONS_CACHE = {"mtime": 0, "data": {}}
+_SESSIONS_LOCK = threading.Lock()  # Guards the sessions.json read-modify-write
+_TOKENS_CACHE = {"mtime": 0, "data": {}}
+# Sessions outlive processes (sessions.json, the daemon) and ids must not
+# repeat within a session, so each process counts from a random 48-bit base
+_RPC_ID = itertools.count(int.from_bytes(os.urandom(6), "big"))
+
+
+def import_httpx():
+    """Import httpx, exiting with a MISSING_DEP error if unavailable."""
+    try:
+        import httpx
+    except ImportError:
+        print('{"ok": false, "error": {"code": "MISSING_DEP", "message": "httpx required: pip install httpx"}}')
+        sys.exit(1)
+    return httpx
+
+
+def _get_http_client():
+    """Get the shared httpx client, creating it on first use.
+
+    Reusing one pooled client keeps TCP/TLS connections alive across
+    requests instead of paying a fresh handshake per JSON-RPC call. With
+    h2 installed, servers that negotiate HTTP/2 multiplex concurrent
+    requests over a single connection.
+    """
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is not None:
+        return _HTTP_CLIENT
+
+    with _HTTP_CLIENT_LOCK:
+        if _HTTP_CLIENT is None:
+            httpx = import_httpx()
+            options = {
+                "timeout": httpx.Timeout(30.0, connect=5.0),
+                "limits": httpx.Limits(max_keepalive_connections=20, max_connections=40),
+                "headers": DEFAULT_HEADERS,
+            }
+            try:
+                _HTTP_CLIENT = httpx.Client(http2=True, **options)
+            except ImportError:
+                # h2 not installed; stay on HTTP/1.1 keep-alive
+                _HTTP_CLIENT = httpx.Client(**options)
+        return _HTTP_CLIENT
+
+
+def close_http_client():
+    """Close the shared httpx client and its pooled connections."""
+    global _HTTP_CLIENT
+    with _HTTP_CLIENT_LOCK:
+        if _HTTP_CLIENT is not None:
+            _HTTP_CLIENT.close()
+            _HTTP_CLIENT = None
+
+
+atexit.register(close_http_client)
+
 
 def load_config():
-    """Load server configurations."""
-    if not CONFIG_FILE.exists():
+    """Load server configurations.
+
+    The parsed config is reused until the file's mtime or size changes.
+    """
+    global _CONFIG_CACHE
+    try:
+        st = os.stat(CONFIG_FILE)
+    except FileNotFoundError:
         return {"servers": {}}
-    with open(CONFIG_FILE) as f:
-        return json.load(f)
+    key = (st.st_mtime_ns, st.st_size)
+    if _CONFIG_CACHE is None or _CONFIG_CACHE[0] != key:
+        _CONFIG_CACHE = (key, json_loads(CONFIG_FILE.read_bytes()))
+    return _CONFIG_CACHE[1]
+
+
+def atomic_write_json(path, data, mode=0o600, indent=False):
+    """Write JSON to a temp file and rename it over path.
+
+    Concurrent readers see either the old or the new file, never a
+    truncated one. The temp file name is unique per call, so concurrent
+    writers in one process (daemon workers) never share it.
+    """
+    import tempfile
+
+    CONFIG_DIR.mkdir(exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp")
+    tmp_path = Path(tmp_path)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(json_dumps(data, indent=indent))
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def load_cached_json(path, cache):
+    """Load a JSON dict file, re-parsing only when its mtime changed."""
+    try:
+        mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    if mtime != cache["mtime"]:
+        cache["data"] = json_loads(path.read_bytes())
+        cache["mtime"] = mtime
+    return dict(cache["data"])
+
+
+def update_cached_json(path, cache, data):
+    """Record freshly written data so the next load skips the re-parse."""
+    cache["data"] = dict(data)
+    cache["mtime"] = path.stat().st_mtime_ns
 
 
 def save_sessions(sessions):
     """Persist session IDs."""
-    CONFIG_DIR.mkdir(exist_ok=True)
-    with open(SESSION_FILE, "w") as f:
-        json.dump(sessions, f)
+    atomic_write_json(SESSION_FILE, sessions)
+    update_cached_json(SESSION_FILE, _SESSIONS_CACHE, sessions)
 
 
 def load_sessions():
     """Load persisted session IDs."""
-    if not SESSION_FILE.exists():
-        return {}
-    with open(SESSION_FILE) as f:
-        return json.load(f)
+    return load_cached_json(SESSION_FILE, _SESSIONS_CACHE)
 
 
 def load_tokens():
     """Load OAuth tokens."""
-    if not TOKENS_FILE.exists():
-        return {}
-    with open(TOKENS_FILE) as f:
-        return json.load(f)
+    return load_cached_json(TOKENS_FILE, _TOKENS_CACHE)
 
 
 def save_tokens(tokens):
     """Save OAuth tokens."""
-    CONFIG_DIR.mkdir(exist_ok=True)
-    with open(TOKENS_FILE, "w") as f:
-        json.dump(tokens, f, indent=2)
-    # Secure the file
-    os.chmod(TOKENS_FILE, 0o600)
+    atomic_write_json(TOKENS_FILE, tokens, indent=True)
+    update_cached_json(TOKENS_FILE, _TOKENS_CACHE, tokens)
+
+
+def store_token(server_name, token_data):
+    """Persist one server's token without clobbering the others."""
+    with _TOKENS_LOCK:
+        tokens = load_tokens()
+        tokens[server_name] = token_data
+        save_tokens(tokens)
+
+
+def load_tools_cache():
+    """Load cached tool listings."""
+    if not TOOLS_CACHE_FILE.exists():
+        return {}
+    try:
+        return json_loads(TOOLS_CACHE_FILE.read_bytes())
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def save_tools_cache(cache):
+    """Persist cached tool listings."""
+    atomic_write_json(TOOLS_CACHE_FILE, cache)
+
+
+def drop_tools_cache(server_name):
+    """Forget a server's cached tool listing."""
+    cache = load_tools_cache()
+    if cache.pop(server_name, None) is not None:
+        save_tools_cache(cache)
+
+
+def tools_cache_source(server_config):
+    """Identify the url and headers a tool listing was fetched with.
+
+    Headers may carry credentials, so only a digest of them is stored.
+    """
+    import hashlib
+
+    headers = json.dumps(server_config.get("headers", {}), sort_keys=True)
+    return {"url": server_config.get("url"), "headers": hashlib.sha256(headers.encode()).hexdigest()}
+
+
+def stamp_token_expiry(token_data):
+    """Replace a token response's relative expires_in with absolute fields.
+
+    expires_at is authoritative; a relative expires_in would be misread as
+    "from now" when the token is loaded later. The lifetime is kept so the
+    refresh buffer can be scaled to short-lived tokens.
+    """
+    lifetime = token_data.pop("expires_in", 3600)
+    token_data["expires_at"] = time.time() + lifetime
+    token_data["lifetime"] = lifetime
+    return token_data
+
+
+def token_refresh_in(token_data, now):
+    """Seconds from now until a token should be refreshed.
+
+    Tokens are refreshed TOKEN_REFRESH_BUFFER before expiry, but never
+    earlier than half-way through their lifetime, so a freshly issued
+    short-lived token is always reused for a while.
+    """
+    expires_at = token_data.get("expires_at", float("inf"))
+    buffer = TOKEN_REFRESH_BUFFER
+    if token_data.get("lifetime"):
+        buffer = min(buffer, token_data["lifetime"] / 2)
+    return expires_at - now - buffer
 
 
 def get_token_for_server(server_name):
-    """Get stored OAuth token for a server."""
-    tokens = load_tokens()
-    if server_name not in tokens:
-        return None
+    """Get stored OAuth token for a server, refreshing it near expiry.
+
+    Memoized tokens are returned without locking; refreshes are serialized
+    per server, so a slow token endpoint only delays its own server.
+    """
+    memo = _TOKEN_MEMO.get(server_name)
+    if memo and time.monotonic() < memo[1]:
+        return memo[0]
+
+    lock = _TOKEN_LOCKS.get(server_name)
+    if lock is None:
+        lock = _TOKEN_LOCKS.setdefault(server_name, threading.Lock())
+
+    with lock:
+        # Another thread may have refreshed while we waited
+        memo = _TOKEN_MEMO.get(server_name)
+        if memo and time.monotonic() < memo[1]:
+            return memo[0]
+
+        tokens = load_tokens()
+        if server_name not in tokens:
+            return None
 
-    token_data = tokens[server_name]
+        token_data = tokens[server_name]
+        expires_at = token_data.get("expires_at", float("inf"))
+        now = time.time()
+        # expires_at is wall-clock on disk; the memo uses the monotonic
+        # clock so wall-clock jumps can't spuriously expire the token
+        refresh_in = token_refresh_in(token_data, now)
 
-    # Check if token is expired
-    if "expires_at" in token_data:
-        if time.time() > token_data["expires_at"] - 60:  # 60s buffer
+        if refresh_in < 0:
             # Try to refresh
+            new_token = None
             if "refresh_token" in token_data:
                 new_token = refresh_oauth_token(server_name, token_data)
-                if new_token:
-                    return new_token.get("access_token")
-            return None
+            if new_token:
+                token_data = new_token
+                refresh_in = token_refresh_in(new_token, time.time())
+            elif now >= expires_at:
+                return None
+            else:
+                # Refresh failed but the token is still valid; serve it
+                # for a while before retrying, never past its expiry
+                refresh_in = min(TOKEN_REFRESH_BACKOFF, expires_at - now)
 
-    return token_data.get("access_token")
+        _TOKEN_MEMO[server_name] = (token_data.get("access_token"), time.monotonic() + refresh_in)
+        return token_data.get("access_token")
 
 
 def refresh_oauth_token(server_name, token_data):
@@ -128,167 +392,204 @@ def refresh_oauth_token(server_name, token_data):
         return None
 
     try:
-        with httpx.Client(timeout=30.0) as client:
-            response = client.post(
-                oauth_config["token_url"],
-                data={
-                    "grant_type": "refresh_token",
-                    "refresh_token": token_data["refresh_token"],
-                    "client_id": oauth_config.get("client_id", "mcp-cli"),
-                },
-                headers={"Content-Type": "application/x-www-form-urlencoded"}
-            )
-
-            if response.status_code == 200:
-                new_token_data = response.json()
-                new_token_data["expires_at"] = time.time() + new_token_data.get("expires_in", 3600)
-
-                # Preserve refresh token if not returned
-                if "refresh_token" not in new_token_data:
-                    new_token_data["refresh_token"] = token_data["refresh_token"]
-
-                tokens = load_tokens()
-                tokens[server_name] = new_token_data
-                save_tokens(tokens)
-                return new_token_data
+        client = _get_http_client()
+        response = client.post(
+            oauth_config["token_url"],
+            data={
+                "grant_type": "refresh_token",
+                "refresh_token": token_data["refresh_token"],
+                "client_id": oauth_config.get("client_id", "mcp-cli"),
+            },
+            headers={"Content-Type": "application/x-www-form-urlencoded"}
+        )
+
+        if response.status_code == 200:
+            new_token_data = stamp_token_expiry(response.json())
+
+            # Preserve refresh token if not returned
+            if "refresh_token" not in new_token_data:
+                new_token_data["refresh_token"] = token_data["refresh_token"]
+
+            store_token(server_name, new_token_data)
+            return new_token_data
     except Exception:
         pass
 
     return None
 
 
-class OAuthCallbackHandler(BaseHTTPRequestHandler):
-    """HTTP handler to catch OAuth callback."""
-
-    auth_code = None
-    state = None
-    error = None
-
-    def do_GET(self):
-        """Handle OAuth callback."""
-        parsed = urlparse(self.path)
-        params = parse_qs(parsed.query)
-
-        if "code" in params:
-            OAuthCallbackHandler.auth_code = params["code"][0]
-            OAuthCallbackHandler.state = params.get("state", [None])[0]
-            self.send_response(200)
-            self.send_header("Content-Type", "text/html")
-            self.end_headers()
-            self.wfile.write(b"""
-                <html><body style="font-family: system-ui; text-align: center; padding: 50px;">
-                <h1>Authorization Successful!</h1>
-                <p>You can close this window and return to your terminal.</p>
-                </body></html>
-            """)
-        elif "error" in params:
-            OAuthCallbackHandler.error = params["error"][0]
-            self.send_response(400)
-            self.send_header("Content-Type", "text/html")
-            self.end_headers()
-            self.wfile.write(f"""
-                <html><body style="font-family: system-ui; text-align: center; padding: 50px;">
-                <h1>Authorization Failed</h1>
-                <p>Error: {params['error'][0]}</p>
-                </body></html>
-            """.encode())
-        else:
-            self.send_response(404)
-            self.end_headers()
+def oauth_callback_handler():
+    """Build the HTTP handler class that catches the OAuth callback."""
+    from http.server import BaseHTTPRequestHandler
+    from urllib.parse import urlparse, parse_qs
+
+    class OAuthCallbackHandler(BaseHTTPRequestHandler):
+        """HTTP handler to catch OAuth callback."""
+
+        auth_code = None
+        state = None
+        error = None
+
+        def do_GET(self):
+            """Handle OAuth callback."""
+            parsed = urlparse(self.path)
+            params = parse_qs(parsed.query)
+
+            if "code" in params:
+                OAuthCallbackHandler.auth_code = params["code"][0]
+                OAuthCallbackHandler.state = params.get("state", [None])[0]
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html")
+                self.end_headers()
+                self.wfile.write(b"""
+                    <html><body style="font-family: system-ui; text-align: center; padding: 50px;">
+                    <h1>Authorization Successful!</h1>
+                    <p>You can close this window and return to your terminal.</p>
+                    </body></html>
+                """)
+            elif "error" in params:
+                OAuthCallbackHandler.error = params["error"][0]
+                self.send_response(400)
+                self.send_header("Content-Type", "text/html")
+                self.end_headers()
+                self.wfile.write(f"""
+                    <html><body style="font-family: system-ui; text-align: center; padding: 50px;">
+                    <h1>Authorization Failed</h1>
+                    <p>Error: {params['error'][0]}</p>
+                    </body></html>
+                """.encode())
+            else:
+                self.send_response(404)
+                self.end_headers()
+
+        def log_message(self, format, *args):
+            """Suppress HTTP logging."""
+            pass
+
+    return OAuthCallbackHandler
+
+
+def parse_resource_metadata_url(www_auth):
+    """Extract the resource_metadata URL from a WWW-Authenticate header."""
+    marker = 'resource_metadata="'
+    start = www_auth.find(marker)
+    if start < 0:
+        return None
+    start += len(marker)
+    end = www_auth.find('"', start)
+    if end <= start:
+        return None
+    return www_auth[start:end]
 
-    def log_message(self, format, *args):
-        """Suppress HTTP logging."""
-        pass
+
+def fetch_first_json(client, urls):
+    """Probe well-known URLs concurrently.
+
+    Returns (url, metadata) for the first URL in list order that answered
+    200, so path-aware locations still win over the root fallbacks.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    def probe(url):
+        # HEAD first so the common 404s don't download an error body;
+        # servers that don't implement HEAD get a plain GET
+        headers = {"Accept": "application/json"}
+        resp = client.head(url, headers=headers, follow_redirects=True)
+        if resp.status_code not in (200, 405, 501):
+            return None
+        resp = client.get(resp.url, headers=headers, follow_redirects=True)
+        if resp.status_code == 200:
+            return resp.json()
+        return None
+
+    executor = ThreadPoolExecutor(max_workers=len(urls))
+    try:
+        futures = [executor.submit(probe, url) for url in urls]
+        for url, future in zip(urls, futures):
+            try:
+                metadata = future.result()
+            except Exception:
+                continue
+            if metadata is not None:
+                return url, metadata
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return None, None
 
 
 def discover_oauth_endpoints(server_url):
     """Discover OAuth endpoints from MCP server using RFC 9728."""
+    from urllib.parse import urlparse
+
     parsed = urlparse(server_url)
     base_url = f"{parsed.scheme}://{parsed.netloc}"
 
     print(f"Discovering OAuth configuration for {base_url}...")
 
     try:
-        with httpx.Client(timeout=30.0, follow_redirects=True) as client:
-            # Step 1: Try to get protected resource metadata
-            # First try path-aware well-known
-            well_known_urls = [
-                f"{base_url}/.well-known/oauth-protected-resource{parsed.path}",
-                f"{base_url}/.well-known/oauth-protected-resource",
-            ]
-
-            resource_metadata = None
-            for url in well_known_urls:
-                try:
-                    resp = client.get(url, headers={"Accept": "application/json"})
+        client = _get_http_client()
+        # Step 1: Try to get protected resource metadata
+        # First try path-aware well-known
+        well_known_urls = [
+            f"{base_url}/.well-known/oauth-protected-resource{parsed.path}",
+            f"{base_url}/.well-known/oauth-protected-resource",
+        ]
+
+        url, resource_metadata = fetch_first_json(client, well_known_urls)
+        if resource_metadata:
+            print(f"  Found resource metadata at {url}")
+
+        if not resource_metadata:
+            # Try getting 401 to extract WWW-Authenticate
+            resp = client.post(
+                server_url,
+                json={"jsonrpc": "2.0", "method": "initialize", "id": "1"},
+                follow_redirects=True,
+            )
+            if resp.status_code == 401:
+                www_auth = resp.headers.get("WWW-Authenticate", "")
+                metadata_url = parse_resource_metadata_url(www_auth)
+                if metadata_url:
+                    resp = client.get(metadata_url, follow_redirects=True)
                     if resp.status_code == 200:
                         resource_metadata = resp.json()
-                        print(f"  Found resource metadata at {url}")
-                        break
-                except Exception:
-                    continue
-
-            if not resource_metadata:
-                # Try getting 401 to extract WWW-Authenticate
-                resp = client.post(
-                    server_url,
-                    json={"jsonrpc": "2.0", "method": "initialize", "id": "1"},
-                    headers=DEFAULT_HEADERS
-                )
-                if resp.status_code == 401:
-                    www_auth = resp.headers.get("WWW-Authenticate", "")
-                    if "resource_metadata=" in www_auth:
-                        import re
-                        match = re.search(r'resource_metadata="([^"]+)"', www_auth)
-                        if match:
-                            metadata_url = match.group(1)
-                            resp = client.get(metadata_url)
-                            if resp.status_code == 200:
-                                resource_metadata = resp.json()
-
-            if not resource_metadata:
-                print("  Could not discover OAuth metadata")
-                return None
 
-            # Step 2: Get authorization server from resource metadata
-            auth_servers = resource_metadata.get("authorization_servers", [])
-            if not auth_servers:
-                print("  No authorization servers found in metadata")
-                return None
+        if not resource_metadata:
+            print("  Could not discover OAuth metadata")
+            return None
 
-            auth_server_issuer = auth_servers[0]
-            print(f"  Authorization server: {auth_server_issuer}")
-
-            # Step 3: Discover auth server endpoints
-            parsed_issuer = urlparse(auth_server_issuer)
-            auth_well_known_urls = [
-                f"{parsed_issuer.scheme}://{parsed_issuer.netloc}/.well-known/oauth-authorization-server{parsed_issuer.path}",
-                f"{parsed_issuer.scheme}://{parsed_issuer.netloc}/.well-known/oauth-authorization-server",
-                f"{parsed_issuer.scheme}://{parsed_issuer.netloc}/.well-known/openid-configuration",
-            ]
-
-            auth_metadata = None
-            for url in auth_well_known_urls:
-                try:
-                    resp = client.get(url, headers={"Accept": "application/json"})
-                    if resp.status_code == 200:
-                        auth_metadata = resp.json()
-                        print(f"  Found auth server metadata")
-                        break
-                except Exception:
-                    continue
-
-            if not auth_metadata:
-                print("  Could not discover auth server metadata")
-                return None
+        # Step 2: Get authorization server from resource metadata
+        auth_servers = resource_metadata.get("authorization_servers", [])
+        if not auth_servers:
+            print("  No authorization servers found in metadata")
+            return None
 
-            return {
-                "auth_url": auth_metadata.get("authorization_endpoint"),
-                "token_url": auth_metadata.get("token_endpoint"),
-                "registration_url": auth_metadata.get("registration_endpoint"),
-                "scopes": resource_metadata.get("scopes_supported", []),
-                "resource": server_url,
-            }
+        auth_server_issuer = auth_servers[0]
+        print(f"  Authorization server: {auth_server_issuer}")
+
+        # Step 3: Discover auth server endpoints
+        parsed_issuer = urlparse(auth_server_issuer)
+        auth_well_known_urls = [
+            f"{parsed_issuer.scheme}://{parsed_issuer.netloc}/.well-known/oauth-authorization-server{parsed_issuer.path}",
+            f"{parsed_issuer.scheme}://{parsed_issuer.netloc}/.well-known/oauth-authorization-server",
+            f"{parsed_issuer.scheme}://{parsed_issuer.netloc}/.well-known/openid-configuration",
+        ]
+
+        _, auth_metadata = fetch_first_json(client, auth_well_known_urls)
+        if auth_metadata:
+            print(f"  Found auth server metadata")
+
+        if not auth_metadata:
+            print("  Could not discover auth server metadata")
+            return None
+
+        return {
+            "auth_url": auth_metadata.get("authorization_endpoint"),
+            "token_url": auth_metadata.get("token_endpoint"),
+            "registration_url": auth_metadata.get("registration_endpoint"),
+            "scopes": resource_metadata.get("scopes_supported", []),
+            "resource": server_url,
+        }
 
     except Exception as e:
         print(f"  Discovery error: {e}")
@@ -300,34 +601,34 @@ def do_dynamic_client_registration(registration_url, redirect_uri, scopes=None):
     print(f"Performing dynamic client registration...")
 
     try:
-        with httpx.Client(timeout=30.0) as client:
-            registration_data = {
-                "client_name": "mcp-cli",
-                "redirect_uris": [redirect_uri],
-                "grant_types": ["authorization_code", "refresh_token"],
-                "response_types": ["code"],
-            }
-            # Include scopes in registration if provided
-            if scopes:
-                registration_data["scope"] = scopes
-
-            response = client.post(
-                registration_url,
-                json=registration_data,
-                headers={"Content-Type": "application/json"}
-            )
-
-            if response.status_code in (200, 201):
-                data = response.json()
-                client_id = data.get("client_id")
-                client_secret = data.get("client_secret")
-                print(f"  Registered client: {client_id}")
-                # Return both client_id and client_secret
-                return {"client_id": client_id, "client_secret": client_secret}
-            else:
-                print(f"  Registration failed: {response.status_code}")
-                print(f"  Response: {response.text}")
-                return None
+        client = _get_http_client()
+        registration_data = {
+            "client_name": "mcp-cli",
+            "redirect_uris": [redirect_uri],
+            "grant_types": ["authorization_code", "refresh_token"],
+            "response_types": ["code"],
+        }
+        # Include scopes in registration if provided
+        if scopes:
+            registration_data["scope"] = scopes
+
+        response = client.post(
+            registration_url,
+            json=registration_data,
+            headers={"Content-Type": "application/json"}
+        )
+
+        if response.status_code in (200, 201):
+            data = response.json()
+            client_id = data.get("client_id")
+            client_secret = data.get("client_secret")
+            print(f"  Registered client: {client_id}")
+            # Return both client_id and client_secret
+            return {"client_id": client_id, "client_secret": client_secret}
+        else:
+            print(f"  Registration failed: {response.status_code}")
+            print(f"  Response: {response.text}")
+            return None
 
     except Exception as e:
         print(f"  Registration error: {e}")
@@ -348,15 +649,25 @@ def save_client_registration(server_name, client_data):
     reg_file = CONFIG_DIR / "registrations.json"
     registrations = load_client_registrations()
     registrations[server_name] = client_data
-    CONFIG_DIR.mkdir(exist_ok=True)
-    with open(reg_file, "w") as f:
-        json.dump(registrations, f, indent=2)
-    # Secure the file since it may contain secrets
-    os.chmod(reg_file, 0o600)
+    # Owner-only since it may contain secrets
+    atomic_write_json(reg_file, registrations, indent=True)
+
+
+def b64url_nopad(data):
+    """Base64url-encode bytes without padding (RFC 7636)."""
+    import base64
+
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
 
 
 def do_oauth_flow(server_name, server_config):
     """Perform OAuth authorization flow."""
+    import hashlib
+    import secrets
+    import webbrowser
+    from http.server import HTTPServer
+    from urllib.parse import urlencode
+
     oauth_config = server_config.get("oauth", {})
 
     # Try auto-discovery if no oauth config
@@ -425,9 +736,7 @@ def do_oauth_flow(server_name, server_config):
 
     # Generate PKCE challenge
     code_verifier = secrets.token_urlsafe(32)
-    code_challenge = base64.urlsafe_b64encode(
-        hashlib.sha256(code_verifier.encode()).digest()
-    ).decode().rstrip("=")
+    code_challenge = b64url_nopad(hashlib.sha256(code_verifier.encode()).digest())
 
     # Generate state for CSRF protection
     state = secrets.token_urlsafe(16)
@@ -447,23 +756,22 @@ def do_oauth_flow(server_name, server_config):
 
     full_auth_url = f"{auth_url}?{urlencode(auth_params)}"
 
-    # Reset handler state
-    OAuthCallbackHandler.auth_code = None
-    OAuthCallbackHandler.state = None
-    OAuthCallbackHandler.error = None
+    # Fresh handler class, so no state leaks from a previous flow
+    OAuthCallbackHandler = oauth_callback_handler()
 
-    # Start server in background
+    # Bind the callback server before opening the browser
     server = HTTPServer(("localhost", callback_port), OAuthCallbackHandler)
-    server_thread = threading.Thread(target=server.handle_request)
-    server_thread.start()
+    server.timeout = 120  # handle_request() returns after 120s without a callback
 
-    print(f"Opening browser for authorization...")
-    print(f"If browser doesn't open, visit: {full_auth_url}")
-    webbrowser.open(full_auth_url)
+    try:
+        print(f"Opening browser for authorization...")
+        print(f"If browser doesn't open, visit: {full_auth_url}")
+        webbrowser.open(full_auth_url)
 
-    # Wait for callback (timeout 120s)
-    server_thread.join(timeout=120)
-    server.server_close()
+        # Wait for callback
+        server.handle_request()
+    finally:
+        server.server_close()
 
     if OAuthCallbackHandler.error:
         print(f"Authorization error: {OAuthCallbackHandler.error}")
@@ -480,116 +788,208 @@ def do_oauth_flow(server_name, server_config):
     # Exchange code for token
     print("Exchanging authorization code for token...")
     try:
-        with httpx.Client(timeout=30.0) as client:
-            token_data_request = {
-                "grant_type": "authorization_code",
-                "code": OAuthCallbackHandler.auth_code,
-                "redirect_uri": redirect_uri,
-                "client_id": client_id,
-                "code_verifier": code_verifier,
-            }
-            # Add client_secret if we have one (confidential client)
-            if client_secret:
-                token_data_request["client_secret"] = client_secret
-
-            response = client.post(
-                token_url,
-                data=token_data_request,
-                headers={"Content-Type": "application/x-www-form-urlencoded"}
-            )
+        client = _get_http_client()
+        token_data_request = {
+            "grant_type": "authorization_code",
+            "code": OAuthCallbackHandler.auth_code,
+            "redirect_uri": redirect_uri,
+            "client_id": client_id,
+            "code_verifier": code_verifier,
+        }
+        # Add client_secret if we have one (confidential client)
+        if client_secret:
+            token_data_request["client_secret"] = client_secret
+
+        response = client.post(
+            token_url,
+            data=token_data_request,
+            headers={"Content-Type": "application/x-www-form-urlencoded"}
+        )
+
+        if response.status_code not in (200, 201):
+            print(f"Token exchange failed: {response.status_code}")
+            print(response.text)
+            return False
 
-            if response.status_code not in (200, 201):
-                print(f"Token exchange failed: {response.status_code}")
-                print(response.text)
-                return False
+        token_data = stamp_token_expiry(response.json())
 
-            token_data = response.json()
-            token_data["expires_at"] = time.time() + token_data.get("expires_in", 3600)
+        # Save token
+        store_token(server_name, token_data)
 
-            # Save token
-            tokens = load_tokens()
-            tokens[server_name] = token_data
-            save_tokens(tokens)
+        # Tools listed before authorizing may differ from what we can see now
+        drop_tools_cache(server_name)
 
-            print(f"Authorization successful! Token saved for '{server_name}'")
-            return True
+        print(f"Authorization successful! Token saved for '{server_name}'")
+        return True
 
     except Exception as e:
         print(f"Token exchange error: {e}")
         return False
 
 
+def write_json(payload):
+    """Write a JSON response to stdout.
+
+    Pretty-printed for terminals, compact when piped to an agent.
+    """
+    sys.stdout.flush()
+    sys.stdout.buffer.write(json_dumps(payload, indent=sys.stdout.isatty()) + b"\n")
+
+
 def ok(data):
     """Return success response."""
-    print(json.dumps({"ok": True, "data": data}, indent=2))
+    write_json({"ok": True, "data": data})
     sys.exit(0)
 
 
 def err(code, message):
     """Return error response."""
-    print(json.dumps({"ok": False, "error": {"code": code, "message": message}}, indent=2))
+    write_json({"ok": False, "error": {"code": code, "message": message}})
     sys.exit(1)
 
 
-def parse_sse_response(text):
-    """Parse SSE response to extract JSON data."""
-    lines = text.strip().split('\n')
-    for line in lines:
-        if line.startswith('data:'):
-            data_str = line[5:].strip()
-            if data_str:
-                try:
-                    return json.loads(data_str)
-                except json.JSONDecodeError:
-                    continue
-    # Try parsing as plain JSON
+def request_headers(server_config, oauth_token=None, session_id=None):
+    """Build request headers for a server.
+
+    DEFAULT_HEADERS are applied by the shared client, so only the server's
+    static headers and the dynamic ones are added here. The daemon memoizes
+    the result per (server, token, session) in MCPDaemon.get_headers.
+    """
+    headers = dict(server_config.get("headers", {}))
+    # OAuth token overrides static Authorization headers
+    if oauth_token:
+        headers["Authorization"] = f"Bearer {oauth_token}"
+    if session_id:
+        headers["Mcp-Session-Id"] = session_id
+    return headers
+
+
+def sse_event_json(frame):
+    """Parse the data: lines of one raw SSE event as JSON, or return None."""
+    data_lines = [
+        line[6:] if line.startswith(b"data: ") else line[5:]
+        for line in frame.splitlines()
+        if line.startswith(b"data:")
+    ]
+    if not data_lines:
+        return None
     try:
-        return json.loads(text)
+        return json_loads(b"\n".join(data_lines))
     except json.JSONDecodeError:
         return None
 
 
-def mcp_request(server_config, method, params=None, session_id=None, oauth_token=None):
-    """Make an MCP JSON-RPC request."""
-    url = server_config["url"]
-    headers = {**DEFAULT_HEADERS}
+def find_event_end(buf, start):
+    """Find the next SSE event boundary; returns (index, separator length)."""
+    lf = buf.find(b"\n\n", start)
+    crlf = buf.find(b"\r\n\r\n", start)
+    if crlf >= 0 and (lf < 0 or crlf < lf):
+        return crlf, 4
+    return lf, 2
+
+
+def scan_sse_events(buf, start, final=False):
+    """Scan buf from start for the first SSE event carrying JSON.
+
+    Returns (result or None, offset of the first unscanned event). With
+    final=True buf is the whole body, so a last event lacking its trailing
+    blank line and a plain JSON body are tried too.
+    """
+    end, sep_len = find_event_end(buf, start)
+    while end >= 0:
+        result = sse_event_json(buf[start:end])
+        if result is not None:
+            return result, start
+        start = end + sep_len
+        end, sep_len = find_event_end(buf, start)
+
+    if not final:
+        return None, start
+    # Last event may lack the trailing blank line
+    result = sse_event_json(buf[start:])
+    if result is not None:
+        return result, start
+    # Try parsing as plain JSON
+    try:
+        return json_loads(buf), start
+    except json.JSONDecodeError:
+        return None, start
 
-    # Add server-specific headers (e.g., Authorization)
-    if "headers" in server_config:
-        headers.update(server_config["headers"])
 
-    # Add OAuth token if available (overrides static headers)
-    if oauth_token:
-        headers["Authorization"] = f"Bearer {oauth_token}"
+def parse_sse_response(body):
+    """Parse a raw SSE response body to extract JSON data.
 
-    # Add session ID if we have one
-    if session_id:
-        headers["Mcp-Session-Id"] = session_id
+    Events are split with bytes.find on the undecoded body and the first
+    event carrying JSON is returned.
+    """
+    return scan_sse_events(body, 0, final=True)[0]
+
+
+def http_error(response):
+    """Build a JSON-RPC style error for a 4xx/5xx HTTP response."""
+    message = f"HTTP {response.status_code} {response.reason_phrase}".rstrip()
+    return {"error": {"code": -32000, "message": message}}
+
+
+def read_jsonrpc_response(response):
+    """Read a JSON-RPC message from a streamed httpx response.
+
+    SSE bodies are parsed as chunks arrive and reading stops at the first
+    event carrying JSON, so the body is never buffered and decoded whole.
+    """
+    if response.is_error:
+        return http_error(response)
+
+    if "text/event-stream" not in response.headers.get("content-type", ""):
+        return json_loads(response.read())
+
+    buf = bytearray()
+    start = 0
+    for chunk in response.iter_bytes(SSE_CHUNK_SIZE):
+        buf += chunk
+        result, start = scan_sse_events(buf, start)
+        if result is not None:
+            return result
+
+    return scan_sse_events(buf, start, final=True)[0]
+
+
+def mcp_request(server_config, method, params=None, session_id=None, oauth_token=None):
+    """Make an MCP JSON-RPC request."""
+    url = server_config["url"]
+    headers = request_headers(server_config, oauth_token, session_id)
 
     payload = {
         "jsonrpc": "2.0",
         "method": method,
-        "id": str(uuid.uuid4()),
+        "id": next(_RPC_ID),
     }
     if params:
         payload["params"] = params
 
+    httpx = import_httpx()
     try:
-        with httpx.Client(timeout=30.0) as client:
-            response = client.post(url, json=payload, headers=headers)
+        client = _get_http_client()
+        response = client.post(url, json=payload, headers=headers)
 
-            # Extract session ID from response headers
-            new_session_id = response.headers.get("Mcp-Session-Id")
+        # Servers answer 404 for sessions they no longer know
+        if response.status_code == 404 and session_id:
+            return {"error": {"code": SESSION_NOT_FOUND, "message": "Session not found"}}, None
+        if response.is_error:
+            return http_error(response), None
 
-            # Parse response (might be SSE or JSON)
-            content_type = response.headers.get("content-type", "")
+        # Extract session ID from response headers
+        new_session_id = response.headers.get("Mcp-Session-Id")
 
-            if "text/event-stream" in content_type:
-                result = parse_sse_response(response.text)
-            else:
-                result = response.json()
+        # Parse response (might be SSE or JSON)
+        content_type = response.headers.get("content-type", "")
 
-            return result, new_session_id
+        if "text/event-stream" in content_type:
+            result = parse_sse_response(response.content)
+        else:
+            result = json_loads(response.content)
+
+        return result, new_session_id
 
     except httpx.TimeoutException:
         return {"error": {"code": -32000, "message": "Request timeout"}}, None
@@ -601,9 +1001,10 @@ def initialize_session(server_name, server_config, oauth_token=None):
     """Initialize MCP session and get session ID."""
     sessions = load_sessions()
 
-    # Check if we have a valid session
-    if server_name in sessions:
-        return sessions[server_name]
+    # Reuse a cached session while it is younger than SESSION_TTL
+    entry = sessions.get(server_name)
+    if isinstance(entry, dict) and time.time() - entry.get("created_at", 0) < SESSION_TTL:
+        return entry["id"]
 
     # Initialize new session
     result, session_id = mcp_request(
@@ -622,51 +1023,84 @@ def initialize_session(server_name, server_config, oauth_token=None):
 
     # Use session ID from response header or generate one
     if session_id:
-        sessions[server_name] = session_id
-        save_sessions(sessions)
+        with _SESSIONS_LOCK:
+            sessions = load_sessions()
+            sessions[server_name] = {"id": session_id, "created_at": time.time()}
+            save_sessions(sessions)
         return session_id
 
     return None
 
 
-def list_tools(server_name, server_config):
-    """List available tools on an MCP server."""
+def drop_session(server_name):
+    """Forget a cached session so the next request re-initializes."""
+    with _SESSIONS_LOCK:
+        sessions = load_sessions()
+        if sessions.pop(server_name, None) is not None:
+            save_sessions(sessions)
+
+
+def session_request(server_name, server_config, method, params=None):
+    """Make an MCP request in the server's session.
+
+    If the server no longer recognizes the cached session, it is dropped
+    and the request is retried once in a fresh session.
+    """
     oauth_token = get_token_for_server(server_name)
     session_id = initialize_session(server_name, server_config, oauth_token=oauth_token)
+    result, _ = mcp_request(server_config, method, params, session_id=session_id, oauth_token=oauth_token)
 
-    result, _ = mcp_request(server_config, "tools/list", session_id=session_id, oauth_token=oauth_token)
+    if session_id and (result or {}).get("error", {}).get("code") == SESSION_NOT_FOUND:
+        drop_session(server_name)
+        session_id = initialize_session(server_name, server_config, oauth_token=oauth_token)
+        result, _ = mcp_request(server_config, method, params, session_id=session_id, oauth_token=oauth_token)
 
-    if "error" in result:
-        err("MCP_ERROR", result["error"].get("message", "Unknown error"))
+    return result
 
-    if "result" in result:
-        tools = result["result"].get("tools", [])
-        ok({
-            "server": server_name,
-            "tools": [
-                {
-                    "name": t.get("name"),
-                    "description": t.get("description", ""),
-                    "parameters": t.get("inputSchema", {})
-                }
-                for t in tools
-            ]
-        })
+
+def list_tools(server_name, server_config):
+    """List available tools on an MCP server."""
+    cache = load_tools_cache()
+    entry = cache.get(server_name)
+    source = tools_cache_source(server_config)
+    # A listing fetched from a different url or with other headers is stale
+    if entry and entry.get("source") == source and time.time() - entry["cached_at"] < TOOLS_CACHE_TTL:
+        tools = entry["tools"]
     else:
-        err("PARSE_ERROR", "Unexpected response format")
+        result = session_request(server_name, server_config, "tools/list")
+
+        if "error" in result:
+            if cache.pop(server_name, None):
+                save_tools_cache(cache)
+            err("MCP_ERROR", result["error"].get("message", "Unknown error"))
+
+        if "result" not in result:
+            err("PARSE_ERROR", "Unexpected response format")
+
+        tools = result["result"].get("tools", [])
+        cache[server_name] = {"tools": tools, "cached_at": time.time(), "source": source}
+        save_tools_cache(cache)
+
+    ok({
+        "server": server_name,
+        "tools": [
+            {
+                "name": t.get("name"),
+                "description": t.get("description", ""),
+                "parameters": t.get("inputSchema", {})
+            }
+            for t in tools
+        ]
+    })
 
 
 def call_tool(server_name, server_config, tool_name, arguments):
     """Call a tool on an MCP server."""
-    oauth_token = get_token_for_server(server_name)
-    session_id = initialize_session(server_name, server_config, oauth_token=oauth_token)
-
-    result, _ = mcp_request(
+    result = session_request(
+        server_name,
         server_config,
         "tools/call",
-        {"name": tool_name, "arguments": arguments},
-        session_id=session_id,
-        oauth_token=oauth_token
+        {"name": tool_name, "arguments": arguments}
     )
 
     if "error" in result:
@@ -721,118 +1155,206 @@ def init_config():
 # Daemon Mode - Keep connections alive for fast queries
 # =============================================================================
 
+def daemon_socket():
+    """Create a Unix stream socket with enlarged kernel buffers."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, DAEMON_SOCKET_BUFSIZE)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, DAEMON_SOCKET_BUFSIZE)
+    return sock
+
+
+def send_message(sock, obj):
+    """Send a JSON message framed with a 4-byte big-endian length prefix."""
+    payload = json_dumps(obj)
+    # Two writes instead of concatenating, so large payloads aren't copied
+    sock.sendall(len(payload).to_bytes(4, "big"))
+    sock.sendall(payload)
+
+
+def recv_exactly(sock, length):
+    """Read exactly length bytes from a socket into a preallocated buffer."""
+    buf = bytearray(length)
+    view = memoryview(buf)
+    offset = 0
+    while offset < length:
+        received = sock.recv_into(view[offset:])
+        if not received:
+            raise ConnectionError("Connection closed mid-message")
+        offset += received
+    return buf
+
+
+def recv_message(sock):
+    """Receive a length-prefixed JSON message."""
+    length = int.from_bytes(recv_exactly(sock, 4), "big")
+    # Reject bogus prefixes (e.g. an unframed peer) before allocating
+    if length > MAX_MESSAGE_SIZE:
+        raise ValueError(f"Message of {length} bytes exceeds MAX_MESSAGE_SIZE")
+    return json_loads(recv_exactly(sock, length))
+
+
 class MCPDaemon:
     """Long-running daemon that keeps MCP connections alive."""
 
+    __slots__ = (
+        "sessions", "tools_cache", "tokens", "locks", "header_cache",
+        "config", "running", "executor", "wakeup",
+    )
+
     def __init__(self):
-        self.clients = {}  # server_name -> httpx.Client
-        self.sessions = {}  # server_name -> session_id
+        self.sessions = {}  # server_name -> (session_id, expires timestamp)
         self.tools_cache = {}  # server_name -> {"tools": [...], "expires": timestamp}
         self.tokens = {}  # server_name -> token
+        self.locks = {}  # (kind, server_name) -> lock coalescing in-flight fetches
+        self.header_cache = {}  # (server_name, token, session_id) -> headers
         self.config = load_config()
         self.running = False
+        self.executor = None  # Worker pool serving connections while running
+        self.wakeup = None  # Socket that wakes the accept loop on stop()
+
+    def lock_for(self, kind, server_name):
+        """Get the lock guarding one kind of fetch for a server."""
+        key = (kind, server_name)
+        lock = self.locks.get(key)
+        if lock is None:
+            lock = self.locks.setdefault(key, threading.Lock())
+        return lock
 
     def get_client(self, server_name):
-        """Get or create persistent httpx client for a server."""
-        if server_name not in self.clients:
-            self.clients[server_name] = httpx.Client(timeout=30.0)
-        return self.clients[server_name]
+        """Get the shared pooled httpx client.
+
+        All servers share one client: connections are kept alive per host,
+        and HTTP/2 servers multiplex requests over a single connection.
+        """
+        return _get_http_client()
 
     def get_token(self, server_name):
-        """Get OAuth token, refreshing if needed."""
-        if server_name not in self.tokens:
-            self.tokens[server_name] = get_token_for_server(server_name)
-        return self.tokens[server_name]
+        """Get OAuth token, refreshing if needed.
+
+        get_token_for_server memoizes the token and serializes refreshes
+        per server, so concurrent requests never refresh the same token
+        twice and never wait on another server's token endpoint.
+        """
+        token = get_token_for_server(server_name)
+        if self.tokens.get(server_name) != token:
+            self.forget_headers(server_name)
+            self.tokens[server_name] = token
+        return token
 
     def get_session(self, server_name, server_config):
-        """Get or initialize MCP session."""
-        if server_name not in self.sessions:
+        """Get or initialize MCP session, re-initializing after SESSION_TTL."""
+        cached = self.sessions.get(server_name)
+        if cached and time.time() < cached[1]:
+            return cached[0]
+
+        with self.lock_for("session", server_name):
+            # Another request may have initialized it while we waited
+            cached = self.sessions.get(server_name)
+            if cached and time.time() < cached[1]:
+                return cached[0]
+
             oauth_token = self.get_token(server_name)
             session_id = initialize_session(server_name, server_config, oauth_token=oauth_token)
-            if session_id:
-                self.sessions[server_name] = session_id
-        return self.sessions.get(server_name)
+            if not session_id:
+                self.sessions.pop(server_name, None)
+                return None
+
+            # A session reused from sessions.json keeps its original age
+            entry = load_sessions().get(server_name)
+            created_at = time.time()
+            if isinstance(entry, dict) and entry.get("id") == session_id:
+                created_at = entry.get("created_at", created_at)
+            self.forget_headers(server_name)
+            self.sessions[server_name] = (session_id, created_at + SESSION_TTL)
+            return session_id
+
+    def reset_session(self, server_name, session_id):
+        """Forget a session the server no longer recognizes."""
+        with self.lock_for("session", server_name):
+            # Another worker may already have replaced it
+            cached = self.sessions.get(server_name)
+            if cached and cached[0] == session_id:
+                del self.sessions[server_name]
+                drop_session(server_name)
+                self.forget_headers(server_name)
+
+    def get_headers(self, server_name, server_config, oauth_token, session_id):
+        """Get request headers, built once per (server, token, session)."""
+        key = (server_name, oauth_token, session_id)
+        headers = self.header_cache.get(key)
+        if headers is None:
+            headers = self.header_cache[key] = request_headers(server_config, oauth_token, session_id)
+        return headers
+
+    def forget_headers(self, server_name):
+        """Drop cached headers after a server's token or session changed."""
+        # list() snapshots the keys so concurrent workers can keep inserting
+        for key in list(self.header_cache):
+            if key[0] == server_name:
+                self.header_cache.pop(key, None)
 
     def get_tools(self, server_name, server_config):
-        """Get tools with caching."""
-        now = time.time()
-        if server_name in self.tools_cache:
-            cached = self.tools_cache[server_name]
-            if now < cached["expires"]:
-                return cached["tools"]
+        """Get tools with caching.
 
-        # Fetch fresh tools
-        oauth_token = self.get_token(server_name)
-        session_id = self.get_session(server_name, server_config)
-        client = self.get_client(server_name)
+        Concurrent requests for the same server share one tools/list fetch,
+        and failures are cached for TOOLS_ERROR_TTL.
+        """
+        cached = self.tools_cache.get(server_name)
+        if cached and time.time() < cached["expires"]:
+            return cached["tools"]
+
+        with self.lock_for("tools", server_name):
+            # Another request may have fetched while we waited
+            now = time.time()
+            cached = self.tools_cache.get(server_name)
+            if cached and now < cached["expires"]:
+                return cached["tools"]
 
-        url = server_config["url"]
-        headers = {**DEFAULT_HEADERS}
-        if "headers" in server_config:
-            headers.update(server_config["headers"])
-        if oauth_token:
-            headers["Authorization"] = f"Bearer {oauth_token}"
-        if session_id:
-            headers["Mcp-Session-Id"] = session_id
-
-        payload = {
-            "jsonrpc": "2.0",
-            "method": "tools/list",
-            "id": str(uuid.uuid4()),
-        }
+            # Fetch fresh tools
+            result = self.session_post(server_name, server_config, TOOLS_LIST_TEMPLATE % next(_RPC_ID))
 
-        try:
-            response = client.post(url, json=payload, headers=headers)
-            content_type = response.headers.get("content-type", "")
-            if "text/event-stream" in content_type:
-                result = parse_sse_response(response.text)
-            else:
-                result = response.json()
+            tools, ttl = [], TOOLS_ERROR_TTL
+            if isinstance(result.get("result"), dict):
+                tools, ttl = result["result"].get("tools", []), TOOLS_CACHE_TTL
 
-            if "result" in result:
-                tools = result["result"].get("tools", [])
-                self.tools_cache[server_name] = {
-                    "tools": tools,
-                    "expires": now + TOOLS_CACHE_TTL
-                }
-                return tools
-        except Exception as e:
-            pass
-        return []
+            self.tools_cache[server_name] = {"tools": tools, "expires": now + ttl}
+            return tools
 
     def call_tool(self, server_name, server_config, tool_name, arguments):
         """Call a tool using persistent connection."""
-        oauth_token = self.get_token(server_name)
-        session_id = self.get_session(server_name, server_config)
-        client = self.get_client(server_name)
-
-        url = server_config["url"]
-        headers = {**DEFAULT_HEADERS}
-        if "headers" in server_config:
-            headers.update(server_config["headers"])
-        if oauth_token:
-            headers["Authorization"] = f"Bearer {oauth_token}"
-        if session_id:
-            headers["Mcp-Session-Id"] = session_id
-
-        payload = {
-            "jsonrpc": "2.0",
-            "method": "tools/call",
-            "id": str(uuid.uuid4()),
-            "params": {"name": tool_name, "arguments": arguments}
-        }
+        body = TOOLS_CALL_TEMPLATE % (next(_RPC_ID), json_dumps(tool_name), json_dumps(arguments))
+        return self.session_post(server_name, server_config, body)
 
+    def post(self, server_name, server_config, body, oauth_token, session_id):
+        """POST a JSON-RPC body and read the (possibly streamed) response."""
+        client = self.get_client(server_name)
+        headers = self.get_headers(server_name, server_config, oauth_token, session_id)
         try:
-            response = client.post(url, json=payload, headers=headers)
-            content_type = response.headers.get("content-type", "")
-            if "text/event-stream" in content_type:
-                result = parse_sse_response(response.text)
-            else:
-                result = response.json()
-            return result
+            with client.stream("POST", server_config["url"], content=body, headers=headers) as response:
+                # Servers answer 404 for sessions they no longer know
+                if response.status_code == 404 and session_id:
+                    return {"error": {"code": SESSION_NOT_FOUND, "message": "Session not found"}}
+                return read_jsonrpc_response(response) or {}
         except Exception as e:
             return {"error": {"code": -32000, "message": str(e)}}
 
+    def session_post(self, server_name, server_config, body):
+        """POST in the server's session, retrying once in a fresh session.
+
+        Mirrors session_request: a session the server no longer recognizes
+        is dropped from memory and sessions.json before the retry.
+        """
+        oauth_token = self.get_token(server_name)
+        session_id = self.get_session(server_name, server_config)
+        result = self.post(server_name, server_config, body, oauth_token, session_id)
+
+        if session_id and result.get("error", {}).get("code") == SESSION_NOT_FOUND:
+            self.reset_session(server_name, session_id)
+            session_id = self.get_session(server_name, server_config)
+            result = self.post(server_name, server_config, body, oauth_token, session_id)
+
+        return result
+
     def handle_command(self, cmd):
         """Handle a daemon command."""
         action = cmd.get("action")
@@ -845,6 +1367,8 @@ class MCPDaemon:
 
         if action == "reload":
             self.config = load_config()
+            self.header_cache.clear()
+            self.tools_cache.clear()
             return {"ok": True, "data": "config reloaded"}
 
         if action == "servers":
@@ -884,12 +1408,47 @@ class MCPDaemon:
 
     def cleanup(self):
         """Close all connections."""
-        for client in self.clients.values():
-            try:
-                client.close()
-            except Exception:
-                pass
-        self.clients.clear()
+        try:
+            close_http_client()
+        except Exception:
+            pass
+
+    def stop(self):
+        """Stop accepting connections and wake the accept loop."""
+        self.running = False
+        try:
+            self.wakeup.send(b"\0")
+        except (AttributeError, OSError):
+            pass
+
+    def accept_connection(self, server):
+        """Accept a pending client connection and hand it to a worker.
+
+        Commands for different servers overlap instead of queueing behind
+        a slow upstream call.
+        """
+        try:
+            conn, _ = server.accept()
+        except (BlockingIOError, InterruptedError):
+            return
+        self.executor.submit(self.serve_connection, conn)
+
+    def serve_connection(self, conn):
+        """Read one framed command, handle it and send back the response."""
+        try:
+            conn.settimeout(DAEMON_IO_TIMEOUT)
+            cmd = recv_message(conn)
+            if cmd.get("action") == "shutdown":
+                self.stop()
+                response = {"ok": True, "data": "shutting down"}
+            else:
+                response = self.handle_command(cmd)
+            send_message(conn, response)
+        except Exception as e:
+            if self.running:
+                print(f"Daemon error: {e}", file=sys.stderr)
+        finally:
+            conn.close()
 
     def run(self):
         """Run the daemon server."""
@@ -904,10 +1463,18 @@ class MCPDaemon:
             f.write(str(os.getpid()))
 
         # Create Unix socket
-        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server = daemon_socket()
         server.bind(str(SOCKET_PATH))
         server.listen(5)
-        server.settimeout(1.0)  # Allow checking self.running
+        server.setblocking(False)
+
+        # stop() writes here so select() wakes up immediately
+        wakeup_r, self.wakeup = socket.socketpair()
+        self.wakeup.setblocking(False)
+
+        selector = selectors.DefaultSelector()
+        selector.register(server, selectors.EVENT_READ)
+        selector.register(wakeup_r, selectors.EVENT_READ)
 
         self.running = True
 
@@ -921,7 +1488,7 @@ class MCPDaemon:
         atexit.register(cleanup_on_exit)
 
         def handle_signal(signum, frame):
-            self.running = False
+            self.stop()
 
         signal.signal(signal.SIGTERM, handle_signal)
         signal.signal(signal.SIGINT, handle_signal)
@@ -929,39 +1496,22 @@ class MCPDaemon:
         print(f"MCP daemon started (pid {os.getpid()})")
         print(f"Socket: {SOCKET_PATH}")
 
-        while self.running:
-            try:
-                conn, _ = server.accept()
-                try:
-                    data = b""
-                    while True:
-                        chunk = conn.recv(4096)
-                        if not chunk:
-                            break
-                        data += chunk
-                        # Check for complete JSON
-                        try:
-                            cmd = json.loads(data.decode())
-                            break
-                        except json.JSONDecodeError:
-                            continue
-
-                    if data:
-                        cmd = json.loads(data.decode())
-                        if cmd.get("action") == "shutdown":
-                            self.running = False
-                            response = {"ok": True, "data": "shutting down"}
-                        else:
-                            response = self.handle_command(cmd)
-                        conn.sendall(json.dumps(response).encode())
-                finally:
-                    conn.close()
-            except socket.timeout:
-                continue
-            except Exception as e:
-                if self.running:
-                    print(f"Daemon error: {e}", file=sys.stderr)
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.executor = ThreadPoolExecutor(max_workers=DAEMON_WORKERS)
 
+        # No polling timeout: select() sleeps until a client connects
+        # or stop() is called
+        while self.running:
+            for key, _ in selector.select():
+                if key.fileobj is server and self.running:
+                    self.accept_connection(server)
+
+        # Let in-flight requests (including the shutdown reply) finish
+        self.executor.shutdown(wait=True)
+        selector.close()
+        wakeup_r.close()
+        self.wakeup.close()
         server.close()
         cleanup_on_exit()
         print("MCP daemon stopped")
@@ -972,12 +1522,12 @@ def is_daemon_running():
     if not SOCKET_PATH.exists():
         return False
     try:
-        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-        sock.connect(str(SOCKET_PATH))
-        sock.sendall(json.dumps({"action": "ping"}).encode())
-        response = sock.recv(4096)
-        sock.close()
-        return json.loads(response.decode()).get("ok", False)
+        with daemon_socket() as sock:
+            sock.settimeout(DAEMON_PING_TIMEOUT)
+            sock.connect(str(SOCKET_PATH))
+            send_message(sock, {"action": "ping"})
+            response = recv_message(sock)
+        return response.get("ok", False)
     except Exception:
         return False
 
@@ -987,23 +1537,13 @@ def daemon_send(cmd):
     if not SOCKET_PATH.exists():
         return {"ok": False, "error": {"code": "DAEMON_NOT_RUNNING", "message": "Daemon not running. Start with --daemon"}}
     try:
-        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock = daemon_socket()
         sock.settimeout(30.0)
         sock.connect(str(SOCKET_PATH))
-        sock.sendall(json.dumps(cmd).encode())
-        data = b""
-        while True:
-            chunk = sock.recv(4096)
-            if not chunk:
-                break
-            data += chunk
-            try:
-                result = json.loads(data.decode())
-                break
-            except json.JSONDecodeError:
-                continue
+        send_message(sock, cmd)
+        response = recv_message(sock)
         sock.close()
-        return json.loads(data.decode())
+        return response
     except Exception as e:
         return {"ok": False, "error": {"code": "DAEMON_ERROR", "message": str(e)}}
 
@@ -1014,26 +1554,40 @@ def daemon_start():
         print("Daemon already running")
         return
 
-    # Fork to background
-    pid = os.fork()
-    if pid > 0:
-        # Parent - wait briefly and check if daemon started
-        time.sleep(0.5)
-        if is_daemon_running():
-            print(f"Daemon started (pid {pid})")
-        else:
-            print("Failed to start daemon")
-        return
+    import subprocess
 
-    # Child - become daemon
-    os.setsid()
-    os.chdir("/")
-
-    # Redirect stdout/stderr to log
+    CONFIG_DIR.mkdir(exist_ok=True)
     log_file = CONFIG_DIR / "daemon.log"
-    sys.stdout = open(log_file, "a")
-    sys.stderr = sys.stdout
 
+    # Spawn a fresh interpreter in its own session instead of forking this
+    # one; Popen uses vfork/posix_spawn, so cost doesn't grow with our heap.
+    # The child's stdout/stderr are the raw O_APPEND log fd, no file object.
+    log_fd = os.open(log_file, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+    try:
+        proc = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--_daemon_child"],
+            stdin=subprocess.DEVNULL,
+            stdout=log_fd,
+            stderr=log_fd,
+            cwd="/",
+            start_new_session=True,
+        )
+    finally:
+        os.close(log_fd)
+
+    # Wait briefly and check if daemon started
+    for _ in range(20):
+        time.sleep(0.1)
+        if is_daemon_running():
+            print(f"Daemon started (pid {proc.pid})")
+            return
+        if proc.poll() is not None:
+            break
+    print("Failed to start daemon")
+
+
+def daemon_child():
+    """Run the daemon in the process spawned by daemon_start."""
     daemon = MCPDaemon()
     daemon.run()
     sys.exit(0)
@@ -1060,7 +1614,7 @@ def daemon_query(server_name, tool_name, arguments):
         "tool": tool_name,
         "arguments": arguments
     })
-    print(json.dumps(response, indent=2))
+    write_json(response)
     sys.exit(0 if response.get("ok") else 1)
 
 
@@ -1070,11 +1624,53 @@ def daemon_tools(server_name):
         "action": "tools",
         "server": server_name
     })
-    print(json.dumps(response, indent=2))
+    write_json(response)
     sys.exit(0 if response.get("ok") else 1)
 
 
+def daemon_status():
+    """Print whether the daemon is running."""
+    if is_daemon_running():
+        print("Daemon is running")
+        if PID_FILE.exists():
+            print(f"PID: {PID_FILE.read_text().strip()}")
+    else:
+        print("Daemon is not running")
+
+
+def parse_json_arguments(args_json):
+    """Parse tool arguments given on the command line."""
+    try:
+        return json.loads(args_json)
+    except json.JSONDecodeError as e:
+        err("INVALID_JSON", f"Invalid JSON arguments: {e}")
+
+
+def daemon_query_args(server_name, tool_name, args_json):
+    """Query daemon for tool call with JSON arguments from the command line."""
+    daemon_query(server_name, tool_name, parse_json_arguments(args_json))
+
+
+# Daemon fast paths dispatched straight from sys.argv, before argparse is
+# imported: flag -> (number of values, handler)
+FAST_DISPATCH = {
+    "--daemon-status": (0, daemon_status),
+    "--daemon-stop": (0, daemon_stop),
+    "--daemon-tools": (1, daemon_tools),
+    "--query": (3, daemon_query_args),
+}
+
+
 def main():
+    if len(sys.argv) >= 2 and sys.argv[1] in FAST_DISPATCH:
+        nargs, handler = FAST_DISPATCH[sys.argv[1]]
+        if len(sys.argv) == nargs + 2:
+            handler(*sys.argv[2:])
+            return
+
+    # Everything else, including malformed fast-path invocations and help
+    import argparse
+
     parser = argparse.ArgumentParser(
         description="MCP CLI - Call MCP servers on-demand",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -1109,6 +1705,7 @@ Daemon mode (fast queries):
     parser.add_argument("--query", nargs=3, metavar=("SERVER", "TOOL", "ARGS"),
                         help="Fast query via daemon: --query <server> <tool> '<json-args>'")
     parser.add_argument("--daemon-tools", metavar="SERVER", help="List tools via daemon")
+    parser.add_argument("--_daemon_child", action="store_true", help=argparse.SUPPRESS)
 
     args = parser.parse_args()
 
@@ -1116,19 +1713,26 @@ Daemon mode (fast queries):
         init_config()
         return
 
+    # Tool listings were fetched with the sessions/tokens being cleared
     if args.clear_sessions:
+        TOOLS_CACHE_FILE.unlink(missing_ok=True)
         if SESSION_FILE.exists():
             SESSION_FILE.unlink()
             print("Sessions cleared.")
         return
 
     if args.clear_tokens:
+        TOOLS_CACHE_FILE.unlink(missing_ok=True)
         if TOKENS_FILE.exists():
             TOKENS_FILE.unlink()
             print("OAuth tokens cleared.")
         return
 
     # Daemon mode handlers
+    if args._daemon_child:
+        daemon_child()
+        return
+
     if args.daemon:
         daemon_start()
         return
@@ -1138,21 +1742,11 @@ Daemon mode (fast queries):
         return
 
     if args.daemon_status:
-        if is_daemon_running():
-            print("Daemon is running")
-            if PID_FILE.exists():
-                print(f"PID: {PID_FILE.read_text().strip()}")
-        else:
-            print("Daemon is not running")
+        daemon_status()
         return
 
     if args.query:
-        server_name, tool_name, args_json = args.query
-        try:
-            arguments = json.loads(args_json)
-        except json.JSONDecodeError as e:
-            err("INVALID_JSON", f"Invalid JSON arguments: {e}")
-        daemon_query(server_name, tool_name, arguments)
+        daemon_query_args(*args.query)
         return
 
     if args.daemon_tools:
@@ -1185,10 +1779,7 @@ Daemon mode (fast queries):
         server_name, tool_name, args_json = args.call
         if server_name not in servers:
             err("NOT_FOUND", f"Server '{server_name}' not configured. Run --servers to list.")
-        try:
-            arguments = json.loads(args_json)
-        except json.JSONDecodeError as e:
-            err("INVALID_JSON", f"Invalid JSON arguments: {e}")
+        arguments = parse_json_arguments(args_json)
         call_tool(server_name, servers[server_name], tool_name, arguments)
         return
 